@@ -1,10 +1,60 @@
+import json
+import time
 import asyncio
+import logging
+import argparse
+from typing import Optional
+
+import nats
+from opentelemetry.trace import Tracer, NoOpTracer
 
 from nats_observe.tracing import setup_tracer
 from nats_observe.logging import setup_logging
+from nats_observe.metrics import process_meter
 from nats_observe.config import NATSotelSettings
 from nats_observe.client import Client as NATSotel
-from nats_observe.handlers import default_trace_handler
+from nats_observe.sketches import HeavyHitters
+from nats_observe.subjects import SubjectNamer
+from nats_observe.sampling import TailSampler
+from nats_observe.recording import TraceRecorder, replay, analyze
+from nats_observe.bench import run_bench, run_bench_processes, format_results
+from nats_observe.handlers import default_trace_handler, heavy_hitters_query_handler
+
+def build_trace_pipeline(cfg: NATSotelSettings, tracer: Tracer, verbose_logging: bool = True):
+    heavy_hitters = HeavyHitters(
+        top_k=cfg.hot_top_k,
+        width=cfg.hot_sketch_width,
+        depth=cfg.hot_sketch_depth,
+        window=cfg.hot_window,
+    )
+
+    tail_sampler = None
+    if cfg.tail_sampling:
+        tail_sampler = TailSampler(
+            tracer,
+            latency_threshold_ms=cfg.tail_latency_threshold_ms,
+            sample_no_egress=cfg.tail_sample_no_egress,
+            sample_errors=cfg.tail_sample_errors,
+            baseline_rate=cfg.tail_baseline_rate,
+            decision_wait=cfg.tail_decision_wait,
+            max_traces=cfg.tail_max_traces,
+            decision_ttl=cfg.tail_decision_ttl,
+            subject_namer=SubjectNamer(
+                cfg.subject_templates,
+                detect_ids=cfg.subject_detect_ids,
+                cache_size=cfg.subject_name_cache_size,
+            ),
+        )
+
+    handler = default_trace_handler(
+        tracer,
+        verbose_logging=verbose_logging,
+        heavy_hitters=heavy_hitters,
+        tail_sampler=tail_sampler,
+    )
+
+    return handler, heavy_hitters, tail_sampler
+
 
 async def run():
     cfg = NATSotelSettings()
@@ -12,18 +62,183 @@ async def run():
     cfg.otlp_logs_header["stream-name"] = "natsotel"
     tracer = setup_tracer(cfg)
     logger = setup_logging(cfg)
-    client = NATSotel(cfg, tracer, logger)
+    meter = process_meter(cfg)
+    client = NATSotel(cfg, tracer, logger, meter)
+
+    handler, heavy_hitters, tail_sampler = build_trace_pipeline(cfg, client.tracer)
+
+    heavy_hitters.register_metrics(meter)
+    if tail_sampler is not None:
+        tail_sampler.register_metrics(meter)
+        tail_sampler.start()
 
     await client.connect(cfg.servers)
 
     # Default tracing subscription
     await client.raw_subscribe(
         cfg.trace_subject,
-        cb=default_trace_handler(client.tracer)
+        cb=handler
+    )
+
+    # Heavy hitter queries, see `python -m nats_observe top`
+    await client.raw_subscribe(
+        cfg.hot_query_subject,
+        cb=heavy_hitters_query_handler(client, heavy_hitters)
     )
-    
+
     await asyncio.Future()
 
 
+async def top(n: int, timeout: float):
+    cfg = NATSotelSettings()
+    nc = await nats.connect(cfg.servers)
+
+    try:
+        reply = await nc.request(cfg.hot_query_subject, json.dumps({"n": n}).encode(), timeout=timeout)
+    finally:
+        await nc.close()
+
+    print_heavy_hitters(json.loads(reply.data.decode()))
+
+
+def print_heavy_hitters(snapshot: dict, rates: bool = True):
+    for table in ("subjects", "publishers", "accounts"):
+        header = f"{table.upper():<48} {'COUNT':>12} {'ERROR':>10}"
+        print(header + (f" {'RATE/s':>10}" if rates else ""))
+        for row in snapshot.get(table, []):
+            line = f"{str(row['key']):<48} {row['count']:>12} {row['error']:>10}"
+            if rates:
+                rate = f"{row['rate']:.2f}" if "rate" in row else "-"
+                line += f" {rate:>10}"
+            print(line)
+        print()
+
+
+async def record(directory: str):
+    cfg = NATSotelSettings()
+    recorder = TraceRecorder(
+        directory,
+        segment_bytes=cfg.record_segment_bytes,
+        block_bytes=cfg.record_block_bytes,
+        flush_interval=cfg.record_flush_interval,
+    )
+
+    nc = await nats.connect(cfg.servers)
+    await nc.subscribe(cfg.trace_subject, cb=recorder.handler)
+    flusher = asyncio.create_task(recorder.run())
+
+    print(f"Recording `{cfg.trace_subject}` into {directory}")
+    try:
+        await asyncio.Future()
+    finally:
+        flusher.cancel()
+        await nc.drain()
+        recorder.close()
+
+
+async def replay_recording(directory: str, since: Optional[float], until: Optional[float], export: bool, report: bool):
+    cfg = NATSotelSettings()
+
+    if export:
+        tracer = setup_tracer(cfg)
+        logging.getLogger("natsotel").addHandler(setup_logging(cfg))
+        logging.getLogger("natsotel").setLevel(logging.INFO)
+    else:
+        tracer = NoOpTracer()
+        logging.getLogger("natsotel").setLevel(logging.ERROR)
+
+    handler, heavy_hitters, tail_sampler = build_trace_pipeline(cfg, tracer, verbose_logging=export)
+
+    started = time.perf_counter()
+    replayed = await replay(directory, handler, since, until)
+    if tail_sampler is not None:
+        tail_sampler.flush()
+    elapsed = time.perf_counter() - started
+
+    print(f"Replayed {replayed} messages in {elapsed:.3f}s ({replayed / max(elapsed, 1e-9):.0f} msgs/s)")
+    # Sketch rates follow the wall clock during replay, not the recorded
+    # timestamps, so leave them out; `--analyze` reports recorded throughput
+    print_heavy_hitters(heavy_hitters.snapshot(10), rates=False)
+
+    if tail_sampler is not None:
+        print(f"Tail sampler kept {tail_sampler.kept}, dropped {tail_sampler.dropped}")
+
+    if report:
+        print(json.dumps(analyze(directory, since, until), indent=2))
+
+
+def bench(args: argparse.Namespace):
+    cfg = NATSotelSettings()
+    modes = {"on": [True], "off": [False], "both": [False, True]}[args.mode]
+    options = dict(
+        publishers=args.publishers,
+        subscribers=args.subscribers,
+        subjects=args.subjects,
+        rate=args.rate,
+        size=args.size,
+        duration=args.duration,
+    )
+
+    results = []
+    if args.processes > 1:
+        for instrumented in modes:
+            results.append(run_bench_processes(args.processes, config=cfg, instrumented=instrumented, **options))
+    else:
+        tracer = setup_tracer(cfg)
+        log_handler = setup_logging(cfg)
+        for instrumented in modes:
+            results.append(asyncio.run(run_bench(
+                cfg, instrumented=instrumented, tracer=tracer, log_handler=log_handler, **options
+            )))
+
+    print(format_results(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="nats_observe")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("run", help="Run the trace collector (default)")
+
+    top_parser = commands.add_parser("top", help="Query a running collector for the hottest subjects")
+    top_parser.add_argument("-n", type=int, default=10, help="Rows per table")
+    top_parser.add_argument("--timeout", type=float, default=2.0, help="Request timeout in seconds")
+
+    record_parser = commands.add_parser("record", help="Record raw trace events to compressed segment files")
+    record_parser.add_argument("--dir", default=None, help="Recording directory (default: RECORD_DIR)")
+
+    replay_parser = commands.add_parser("replay", help="Replay a recording through the collector pipeline")
+    replay_parser.add_argument("--dir", default=None, help="Recording directory (default: RECORD_DIR)")
+    replay_parser.add_argument("--since", type=float, default=None, help="Unix time to start from")
+    replay_parser.add_argument("--until", type=float, default=None, help="Unix time to stop at")
+    replay_parser.add_argument("--export", action="store_true", help="Export spans and logs like the live collector")
+    replay_parser.add_argument("--analyze", action="store_true", help="Print a percentile and throughput report")
+
+    bench_parser = commands.add_parser("bench", help="Load test a nats-server through the instrumented client")
+    bench_parser.add_argument("--publishers", type=int, default=1, help="Publisher tasks per process")
+    bench_parser.add_argument("--subscribers", type=int, default=1, help="Subscriptions per process, each receives every message")
+    bench_parser.add_argument("--subjects", type=int, default=1, help="Distinct subjects to publish to")
+    bench_parser.add_argument("--rate", type=float, default=1000.0, help="Msgs/s per publisher, 0 for unlimited")
+    bench_parser.add_argument("--size", type=int, default=128, help="Payload size in bytes")
+    bench_parser.add_argument("--duration", type=float, default=5.0, help="Seconds to publish for")
+    bench_parser.add_argument("--processes", type=int, default=1, help="Worker processes, each with its own subjects")
+    bench_parser.add_argument("--mode", choices=["on", "off", "both"], default="both", help="Instrumentation on, off or both")
+
+    args = parser.parse_args()
+
+    if args.command == "top":
+        asyncio.run(top(args.n, args.timeout))
+    elif args.command == "record":
+        asyncio.run(record(args.dir or NATSotelSettings().record_dir))
+    elif args.command == "replay":
+        asyncio.run(replay_recording(
+            args.dir or NATSotelSettings().record_dir, args.since, args.until, args.export, args.analyze
+        ))
+    elif args.command == "bench":
+        bench(args)
+    else:
+        asyncio.run(run())
+
+
 if __name__ == "__main__":
-    asyncio.run(run())
+    main()
@@ -0,0 +1,257 @@
+import time
+import uuid
+import asyncio
+import logging
+from array import array
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+from opentelemetry.trace import Tracer
+
+from .client import Client
+from .config import NATSotelSettings
+
+BENCH_TIMESTAMP_HEADER = "Nats-Bench-Ts"
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integer values (nanoseconds here).
+
+    Values below ``2 ** precision_bits`` are counted exactly; above that,
+    every power of two is split into ``2 ** (precision_bits - 1)`` linear
+    buckets, which bounds the relative error to ``2 ** -(precision_bits - 1)``
+    while keeping the histogram a fixed-size array of counters.
+    """
+
+    def __init__(self, precision_bits: int = 8, max_value: int = 60 * 1_000_000_000):
+        self.precision_bits = precision_bits
+        self.max_value = max_value
+
+        self._sub = 1 << precision_bits
+        self._half = self._sub >> 1
+        self.counts = array("Q", bytes(8 * (self._index(max_value) + 1)))
+
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return (shift + 1) * self._half + (value >> shift) - self._half
+
+    def _value(self, index: int) -> int:
+        """Midpoint of the values counted in bucket ``index``."""
+        if index < self._sub:
+            return index
+        shift = index // self._half - 1
+        low = (index % self._half + self._half) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value: int) -> None:
+        value = min(max(value, 0), self.max_value)
+
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if (other.precision_bits, other.max_value) != (self.precision_bits, self.max_value):
+            raise ValueError("Can only merge histograms with the same precision and range")
+
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+
+        self.count += other.count
+        self.total += other.total
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    def percentile(self, p: float) -> Optional[int]:
+        if not self.count:
+            return None
+
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                # Never report beyond what was actually observed
+                return min(max(self._value(i), self.min), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+@dataclass
+class BenchResult:
+    instrumented: bool
+    sent: int = 0
+    received: int = 0
+    elapsed: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def throughput(self) -> float:
+        return self.received / self.elapsed if self.elapsed > 0 else 0.0
+
+    def merge(self, other: "BenchResult") -> None:
+        self.sent += other.sent
+        self.received += other.received
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.latency.merge(other.latency)
+
+
+async def run_bench(
+    config: Optional[NATSotelSettings] = None,
+    instrumented: bool = True,
+    publishers: int = 1,
+    subscribers: int = 1,
+    subjects: int = 1,
+    rate: float = 1000.0,
+    size: int = 128,
+    duration: float = 5.0,
+    prefix: Optional[str] = None,
+    tracer: Optional[Tracer] = None,
+    log_handler = None,
+) -> BenchResult:
+    """
+    Publish ``size``-byte messages for ``duration`` seconds from
+    ``publishers`` tasks, each at ``rate`` msgs/s (0 for as fast as possible),
+    round-robin over ``subjects`` subjects, to ``subscribers`` wildcard
+    subscribers. Latency is measured from a send timestamp header.
+
+    With ``instrumented`` the traced :class:`Client` publish/subscribe paths are
+    used, otherwise `raw_publish`/`raw_subscribe` on the same connections.
+    Pass ``tracer``/``log_handler`` to reuse providers across several runs.
+    """
+    config = (config or NATSotelSettings()).model_copy()
+    # `NATS-Trace-Only` stops the server from delivering the message at all
+    config.trace_only = ""
+
+    prefix = prefix or f"bench.{uuid.uuid4().hex[:8]}"
+    targets = [f"{prefix}.{i}" for i in range(subjects)]
+    payload = b"x" * size
+
+    result = BenchResult(instrumented)
+    done = asyncio.Event()
+    expected: Optional[int] = None
+
+    sub_client = Client(config, tracer, log_handler)
+    pub_client = Client(config, sub_client.tracer, sub_client.log_handler)
+    await sub_client.connect(config.servers)
+    await pub_client.connect(config.servers)
+
+    async def on_message(msg):
+        sent_at = (msg.headers or {}).get(BENCH_TIMESTAMP_HEADER)
+        if sent_at is not None:
+            result.latency.record(time.time_ns() - int(sent_at))
+        result.received += 1
+
+        if expected is not None and result.received >= expected:
+            done.set()
+
+    for _ in range(subscribers):
+        if instrumented:
+            await sub_client.subscribe(f"{prefix}.>", cb=on_message)
+        else:
+            await sub_client.raw_subscribe(f"{prefix}.>", cb=on_message)
+    await sub_client.flush()
+
+    async def publisher(offset: int):
+        interval = 1.0 / rate if rate > 0 else 0.0
+        started = time.perf_counter()
+        deadline = started + duration
+        n = 0
+
+        while time.perf_counter() < deadline:
+            headers = {BENCH_TIMESTAMP_HEADER: str(time.time_ns())}
+            subject = targets[(offset + n) % len(targets)]
+
+            if instrumented:
+                await pub_client.publish(subject, payload, headers=headers)
+            else:
+                await pub_client.raw_publish(subject, payload, headers=headers)
+
+            result.sent += 1
+            n += 1
+
+            # Pace against the schedule rather than sleeping a fixed interval,
+            # so the configured rate holds even when sleeps overshoot
+            ahead = started + n * interval - time.perf_counter()
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+            elif n % 256 == 0:
+                await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(publisher(i) for i in range(publishers)))
+    await pub_client.flush()
+
+    expected = result.sent * subscribers
+    if result.received < expected:
+        try:
+            await asyncio.wait_for(done.wait(), timeout=max(1.0, duration / 2))
+        except asyncio.TimeoutError:
+            logging.getLogger("natsotel").warning(
+                f"Benchmark received {result.received} of {expected} messages"
+            )
+    result.elapsed = time.perf_counter() - started
+
+    await pub_client.close()
+    await sub_client.close()
+
+    return result
+
+
+def _bench_process(kwargs: dict) -> BenchResult:
+    return asyncio.run(run_bench(**kwargs))
+
+
+def run_bench_processes(processes: int, **kwargs) -> BenchResult:
+    """Run :func:`run_bench` in ``processes`` worker processes, each on its own subjects, and merge the results."""
+    prefix = kwargs.pop("prefix", None) or f"bench.{uuid.uuid4().hex[:8]}"
+    jobs = [{**kwargs, "prefix": f"{prefix}.p{i}"} for i in range(processes)]
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(_bench_process, jobs))
+
+    merged = results[0]
+    for other in results[1:]:
+        merged.merge(other)
+    return merged
+
+
+def format_results(results: Iterable[BenchResult], percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> str:
+    percentiles = list(percentiles)
+    header = ["instrumentation", "sent", "received", "elapsed s", "msgs/s"]
+    header += [f"p{p:g} ms" for p in percentiles] + ["max ms"]
+
+    rows: List[List[str]] = [header]
+    for result in results:
+        latency = result.latency
+        row = [
+            "on" if result.instrumented else "off",
+            str(result.sent),
+            str(result.received),
+            f"{result.elapsed:.2f}",
+            f"{result.throughput:.0f}",
+        ]
+        for value in [latency.percentile(p) for p in percentiles] + [latency.max]:
+            row.append("-" if value is None else f"{value / 1e6:.3f}")
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(w) for cell, w in zip(row, widths)) for row in rows)
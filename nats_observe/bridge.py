@@ -0,0 +1,146 @@
+import queue
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Tuple
+
+from opentelemetry import context as otel_context
+from opentelemetry.context import Context
+
+if TYPE_CHECKING:
+    from .client import Client
+
+_Entry = Tuple[str, bytes, Optional[Dict[str, str]], Context]
+
+
+class ThreadSafePublisher:
+    """
+    Accepts publishes from any thread and drains them into the client's loop.
+
+    :meth:`publish` captures the caller's current OpenTelemetry context and
+    appends to a bounded deque; the drain side pops without locking, a short
+    lock only orders appends against :meth:`close`. The event loop is only
+    woken when the drain task is idle, and then
+    publishes up to ``batch_size`` messages per wake-up through
+    :meth:`Client.publish`, so every message still gets its own span parented
+    to the context it was enqueued under.
+    """
+
+    def __init__(self, client: "Client", capacity: int = 10000, batch_size: int = 256):
+        self.client = client
+        self.capacity = capacity
+        self.batch_size = batch_size
+
+        self._buffer: Deque[_Entry] = deque()
+        # Free slots, producers block (or fail) on it when the buffer is full
+        self._slots = threading.Semaphore(capacity)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wakeup_pending = False
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        # Orders enqueues against close(), so nothing lands after the last drain
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> "ThreadSafePublisher":
+        """Bind to the running event loop and start draining. Must be called from that loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._drain())
+        return self
+
+    def publish(
+        self,
+        subject: str,
+        data: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Enqueue a message from any thread. Blocks while the buffer is full,
+        unless ``block`` is false or ``timeout`` expires, in which case
+        :class:`queue.Full` is raised.
+
+        On the event loop's own thread the call never blocks, since the drain
+        task could not run to free a slot; prefer awaiting `Client.publish`.
+        """
+        if self._closed or self._loop is None:
+            raise RuntimeError("ThreadSafePublisher is not running")
+
+        if threading.get_ident() == self._loop_thread:
+            block = False
+
+        acquired = self._slots.acquire(True, timeout) if block else self._slots.acquire(False)
+        if not acquired:
+            raise queue.Full(f"{self.capacity} messages already pending")
+
+        entry = (subject, data, dict(headers) if headers else None, otel_context.get_current())
+
+        with self._lock:
+            if self._closed:
+                # Hand the slot on, close() may have woken us to fail
+                self._slots.release()
+                raise RuntimeError("ThreadSafePublisher is closed")
+
+            self._buffer.append(entry)
+
+            if not self._wakeup_pending:
+                self._wakeup_pending = True
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _drain(self):
+        buffer = self._buffer
+        logger = logging.getLogger(self.client.config.service_name)
+
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                # Reset before draining, so an append racing with the drain
+                # schedules another wake-up instead of being left behind
+                self._wakeup_pending = False
+                # Once closed nothing more is appended, so this pass is the last
+                closed = self._closed
+
+            while buffer:
+                published = 0
+                while buffer and published < self.batch_size:
+                    subject, data, headers, ctx = buffer.popleft()
+                    published += 1
+
+                    try:
+                        await self.client.publish(subject, data, headers=headers, context=ctx)
+                    except Exception:
+                        logger.exception(f"Failed to publish to `{subject}` from another thread")
+
+                self._slots.release(published)
+                # Let other tasks run between batches
+                await asyncio.sleep(0)
+
+            if closed:
+                return
+
+    async def close(self) -> None:
+        """Stop accepting messages and publish whatever is still buffered."""
+        if self._task is None:
+            return
+
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+
+        await self._task
+        self._task = None
+
+        # Wake producers still blocked on a full buffer; each one hands its
+        # slot on and raises, so every waiter is released in turn
+        self._slots.release()
@@ -2,7 +2,7 @@ import socket
 import logging
 import asyncio, ssl
 from urllib.parse import urlunparse
-from typing import List, Optional, Union, Awaitable, Callable
+from typing import Dict, List, Optional, Union, Awaitable, Callable
 
 from nats.aio import client
 from nats.aio.msg import Msg
@@ -32,19 +32,35 @@ from nats.aio.client import (
 )
 
 from opentelemetry.trace import Tracer, use_span, Context, set_span_in_context, get_current_span
+from opentelemetry.metrics import Meter
 from opentelemetry import _logs as logs
 from opentelemetry._logs import LogRecord
 
 from .tracing import setup_tracer
 from .logging import setup_logging
+from .metrics import process_meter
+from .health import ConnectionHealth
+from .bridge import ThreadSafePublisher
 from .config import NATSotelSettings, PROPAGATOR
+from .utils import callback_attributes
+from .subjects import SubjectNamer
+from .router import TracedRouter
 
 
 class Client(client.Client):
-    def __init__(self, config: NATSotelSettings = None, tracer: Optional[Tracer] = None, log_handler = None ):
+    def __init__(self, config: NATSotelSettings = None, tracer: Optional[Tracer] = None, log_handler = None, meter: Optional[Meter] = None ):
         self.config = config if config else NATSotelSettings()
         self.tracer = tracer if tracer else setup_tracer(self.config)
         self.log_handler = log_handler if log_handler else setup_logging(self.config)
+        # Only needed for connection health, so the process meter is set up lazily
+        self.meter = meter
+        self.health: Optional[ConnectionHealth] = None
+        self._publishers: List[ThreadSafePublisher] = []
+        self.subject_namer = SubjectNamer(
+            self.config.subject_templates,
+            detect_ids=self.config.subject_detect_ids,
+            cache_size=self.config.subject_name_cache_size,
+        )
 
         for logger_name in ["natsotel", self.config.service_name]:
             logging.getLogger(logger_name).addHandler(self.log_handler)
@@ -123,6 +139,45 @@ class Client(client.Client):
             flush_timeout = flush_timeout,
         )
 
+        if self.config.health_interval > 0:
+            self.start_health_monitor()
+
+    def start_health_monitor(self, interval: Optional[float] = None) -> ConnectionHealth:
+        if self.health is None:
+            if self.meter is None:
+                self.meter = process_meter(self.config)
+
+            self.health = ConnectionHealth(
+                self,
+                interval = interval if interval else (self.config.health_interval or 10.0),
+                rtt_timeout = self.config.health_rtt_timeout,
+            )
+            self.health.register_metrics(self.meter)
+
+        self.health.start()
+        return self.health
+
+    def threadsafe_publisher(self, capacity: Optional[int] = None, batch_size: Optional[int] = None) -> ThreadSafePublisher:
+        publisher = ThreadSafePublisher(
+            self,
+            capacity = capacity if capacity else self.config.publish_bridge_capacity,
+            batch_size = batch_size if batch_size else self.config.publish_bridge_batch_size,
+        )
+        self._publishers.append(publisher)
+
+        return publisher.start()
+
+    async def close(self) -> None:
+        if self.health is not None:
+            self.health.stop()
+
+        # Flush messages handed over by other threads while still connected
+        for publisher in self._publishers:
+            await publisher.close()
+        self._publishers.clear()
+
+        await super().close()
+
     def _make_event_cb(self, cb_name: str, _cb: Optional[ErrorCallback | Callback] = None):
         async def cb(*args, **kwargs):            
             # Add a Trace
@@ -145,22 +200,13 @@ class Client(client.Client):
                 if _cb:
                     await _cb(*args, **kwargs)
 
-                    callback_attributes = {
-                        "callback.module": cb.__module__,
-                        "callback.repr": str(cb.__repr__()),
-                        "callback.name": cb.__code__.co_name,
-                        "callback.names": list(cb.__code__.co_names),
-                        "callback.qualname": cb.__code__.co_qualname,
-                        "callback.filename": cb.__code__.co_filename,
-                    }
-
                     # Create an event for triggered callback
                     span.add_event(
                         "callback",
                         attributes={
                             **span_attributes,
                             # Callback
-                            **callback_attributes
+                            **callback_attributes(_cb)
                         }
                     )
 
@@ -176,12 +222,15 @@ class Client(client.Client):
         if self.config.trace_only:
             headers["NATS-Trace-Only"] = self.config.trace_only
 
-        with self.tracer.start_as_current_span(f"nats.publish({subject})", context=context) as span:
+        subject_name = self.subject_namer.normalize(subject)
+
+        with self.tracer.start_as_current_span(f"nats.publish({subject_name})", context=context) as span:
             # Log the event
             span_attributes = {}
             span_attributes.update(self._server_info)
             span_attributes["host"] = socket.gethostname()
             span_attributes["nats.subject"] = subject
+            span_attributes["messaging.destination.template"] = subject_name
             span_attributes["nats.msgsize"] = len(data)
             span_attributes["nats.payload"] = data.decode()
 
@@ -209,26 +258,22 @@ class Client(client.Client):
             await super().publish(subject, data, headers=headers)
 
     async def subscribe(self, subject: str, cb: Callback):
+        subject_name = self.subject_namer.normalize(subject)
+        # Callback attributes are static, so introspect once per subscription
+        cb_attributes = callback_attributes(cb)
+
         async def wrapper(msg):
             # Extract tracing context from headers
             ctx = PROPAGATOR.extract(msg.header or {})
 
-            with self.tracer.start_as_current_span(f"nats.subscribe({subject})", context=ctx ) as span:
+            with self.tracer.start_as_current_span(f"nats.subscribe({subject_name})", context=ctx ) as span:
                 span_attributes = {}
                 span_attributes["host"] = socket.gethostname()
                 span_attributes.update(self._server_info)
                 span_attributes["nats.subject"] = subject
+                span_attributes["messaging.destination.template"] = subject_name
                 span_attributes["nats.payload"] = msg.data.decode()
 
-                callback_attributes = {
-                    "callback.module": cb.__module__,
-                    "callback.repr": str(cb.__repr__()),
-                    "callback.name": cb.__code__.co_name,
-                    "callback.names": list(cb.__code__.co_names),
-                    "callback.qualname": cb.__code__.co_qualname,
-                    "callback.filename": cb.__code__.co_filename,
-                }
-
                 # Log the event
                 logger = logging.getLogger(self.config.service_name)
 
@@ -255,12 +300,15 @@ class Client(client.Client):
                     attributes={
                         **span_attributes,
                         # Callback
-                        **callback_attributes
+                        **cb_attributes
                     }
                 )
 
         await super().subscribe(subject, cb=wrapper)
 
+    def router(self, subject: str, queue: str = "") -> TracedRouter:
+        return TracedRouter(self, subject, queue=queue)
+
     async def raw_subscribe(self, 
         subject: str,
         queue: str = "",
@@ -278,4 +326,17 @@ class Client(client.Client):
             max_msgs = max_msgs,
             pending_msgs_limit = pending_msgs_limit,
             pending_bytes_limit = pending_bytes_limit,
-        )
\ No newline at end of file
+        )
+
+    async def raw_publish(self,
+        subject: str,
+        payload: bytes = b"",
+        reply: str = "",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        await super().publish(
+            subject = subject,
+            payload = payload,
+            reply = reply,
+            headers = headers,
+        )
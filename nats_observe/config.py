@@ -16,6 +16,12 @@ class OTLPLogsConfig(BaseModel):
     otlp_logs_insecure: bool = True
     otlp_logs_header: Optional[Mapping[str, str]] = None
 
+class OTLPMetricsConfig(BaseModel):
+    otlp_metrics_endpoint: Optional[str] = "localhost:5081"
+    otlp_metrics_insecure: bool = True
+    otlp_metrics_header: Optional[Mapping[str, str]] = None
+    otlp_metrics_interval: float = 30.0
+
 class ZipkinExporterConfig(BaseModel):
     zipkin_endpoint: Optional[str] = "http://localhost:9411/api/v2/spans"
 
@@ -27,7 +33,55 @@ class NATSConfig(BaseModel):
     trace_subject: str = "trace.logs"
     trace_only: str = "true"
 
-class NATSotelSettings(BaseSettings, NATSConfig, OTLPTraceConfig, OTLPLogsConfig):
+class HealthConfig(BaseModel):
+    health_interval: float = 0.0
+    health_rtt_timeout: float = 2.0
+
+class PublishBridgeConfig(BaseModel):
+    publish_bridge_capacity: int = 10000
+    publish_bridge_batch_size: int = 256
+
+class SubjectNamingConfig(BaseModel):
+    subject_templates: List[str] = []
+    subject_detect_ids: bool = True
+    subject_name_cache_size: int = 1024
+
+class HeavyHittersConfig(BaseModel):
+    hot_top_k: int = 32
+    hot_sketch_width: int = 2048
+    hot_sketch_depth: int = 4
+    hot_window: float = 60.0
+    hot_query_subject: str = "observatory.hot"
+
+class TailSamplingConfig(BaseModel):
+    tail_sampling: bool = False
+    tail_latency_threshold_ms: Optional[float] = 250.0
+    tail_sample_no_egress: bool = True
+    tail_sample_errors: bool = True
+    tail_baseline_rate: float = 0.01
+    tail_decision_wait: float = 5.0
+    tail_max_traces: int = 10000
+    tail_decision_ttl: float = 60.0
+
+class RecordingConfig(BaseModel):
+    record_dir: str = "recordings"
+    record_segment_bytes: int = 64 * 1024 * 1024
+    record_block_bytes: int = 256 * 1024
+    record_flush_interval: float = 1.0
+
+class NATSotelSettings(
+    BaseSettings,
+    NATSConfig,
+    SubjectNamingConfig,
+    HealthConfig,
+    PublishBridgeConfig,
+    OTLPTraceConfig,
+    OTLPLogsConfig,
+    OTLPMetricsConfig,
+    HeavyHittersConfig,
+    TailSamplingConfig,
+    RecordingConfig,
+):
     model_config = SettingsConfigDict(
         env_file=".env",
         env_nested_delimiter="_",
@@ -2,22 +2,33 @@ import json
 import socket
 import logging
 
+from typing import Optional
 from collections import Counter
 
 from .config import PROPAGATOR
 from .utils import get_trace_spancontext
+from .sketches import HeavyHitters
+from .sampling import TailSampler
 
 from opentelemetry.context import Context
 from opentelemetry.trace import Tracer
 
 
-def default_trace_handler(tracer: Tracer, verbose_logging: bool = True):
+def default_trace_handler(
+    tracer: Tracer,
+    verbose_logging: bool = True,
+    heavy_hitters: Optional[HeavyHitters] = None,
+    tail_sampler: Optional[TailSampler] = None,
+):
     async def handler(msg):
         try:
             payload = json.loads(msg.data.decode())
         except Exception:
             payload = {}
 
+        if heavy_hitters is not None:
+            heavy_hitters.observe_trace(payload)
+
         logger = logging.getLogger('natsotel')
 
         trace_dest = payload.get("request", {}).get("header", {}).get("Nats-Trace-Dest", [msg.subject])
@@ -37,6 +48,9 @@ def default_trace_handler(tracer: Tracer, verbose_logging: bool = True):
             ctx_extra["trace_id"] = f"{span_context_list[0].trace_id:x}"
             ctx_extra["span_id"] = f"{span_context_list[0].span_id:x}"
 
+            if tail_sampler is not None:
+                tail_sampler.add(span_context_list[0].trace_id, ctx, payload)
+
         # Nats.io Event Stats
         nats_event_stats = Counter([event.get("type") for event in events])
         # nats_event_stats.get('in', 0)
@@ -76,3 +90,19 @@ def default_trace_handler(tracer: Tracer, verbose_logging: bool = True):
         #                 ev_span.set_attribute(f"event.{k}", v)
 
     return handler
+
+
+def heavy_hitters_query_handler(client, heavy_hitters: HeavyHitters):
+    async def handler(msg):
+        try:
+            query = json.loads(msg.data.decode()) if msg.data else {}
+        except Exception:
+            query = {}
+
+        snapshot = heavy_hitters.snapshot(query.get("n"))
+
+        # Reply without instrumentation, so queries don't show up as traffic
+        if msg.reply:
+            await client.raw_publish(msg.reply, json.dumps(snapshot).encode())
+
+    return handler
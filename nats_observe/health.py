@@ -0,0 +1,165 @@
+import uuid
+import asyncio
+import logging
+import weakref
+from typing import TYPE_CHECKING, Dict, Optional
+
+from opentelemetry.metrics import Meter, Observation
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class ConnectionHealth:
+    """
+    Samples a client's connection statistics every ``interval`` seconds.
+
+    Each sample copies nats-py's message/byte/reconnect/error counters, the
+    pending write buffer size and the current server, and measures the round
+    trip time with a PING/PONG. Observable instruments registered through
+    :meth:`register_metrics` report the latest sample, so exporting costs
+    nothing on the message path.
+
+    The instruments are created once per meter and report every monitor
+    registered on it, each labelled with its own ``nats.client.id``, so any
+    number of clients can share one meter.
+    """
+
+    # Monitors registered per meter; instruments exist once per meter
+    _monitors: "weakref.WeakKeyDictionary[Meter, weakref.WeakSet[ConnectionHealth]]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, client: "Client", interval: float = 10.0, rtt_timeout: float = 2.0):
+        self.client = client
+        self.interval = interval
+        self.rtt_timeout = rtt_timeout
+        # Stable for the client's lifetime, unlike the server-assigned cid
+        self.client_id = uuid.uuid4().hex[:12]
+        self.attributes = {"nats.client.id": self.client_id}
+
+        self.stats: Dict[str, int] = {}
+        self.pending_bytes = 0
+        self.server = ""
+        self.connected = False
+        self.rtt: Optional[float] = None
+
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        client = self.client
+
+        self.stats = dict(client.stats)
+        self.connected = client.is_connected
+        self.pending_bytes = client.pending_data_size if self.connected else 0
+
+        url = client.connected_url
+        self.server = url.netloc if url else ""
+
+    async def probe_rtt(self) -> Optional[float]:
+        if not self.client.is_connected:
+            self.rtt = None
+            return None
+
+        try:
+            self.rtt = await self.client.rtt(self.rtt_timeout)
+        except Exception as e:
+            logging.getLogger("natsotel").debug(f"RTT probe failed: {e!r}")
+            self.rtt = None
+
+        return self.rtt
+
+    async def run(self):
+        while not self.client.is_closed:
+            self.sample()
+            await self.probe_rtt()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        # A stopped monitor no longer reports, so its series go stale
+        for monitors in self._monitors.values():
+            monitors.discard(self)
+
+    def register_metrics(self, meter: Meter) -> None:
+        """Export the latest sample as observable counters and gauges on ``meter``."""
+        monitors = self._monitors.get(meter)
+        if monitors is None:
+            monitors = self._monitors[meter] = weakref.WeakSet()
+            _create_instruments(meter, monitors)
+
+        monitors.add(self)
+
+
+def _create_instruments(meter: Meter, monitors: "weakref.WeakSet[ConnectionHealth]") -> None:
+    # nats-py's counters accumulate over the client's lifetime, across
+    # reconnects, so they carry no server attribute: a new series per
+    # server would restart at the full total and double count.
+    def counter(*keys_and_attributes):
+        def callback(options):
+            return [
+                Observation(health.stats.get(key, 0), {**health.attributes, **attributes})
+                for health in list(monitors)
+                for key, attributes in keys_and_attributes
+            ]
+
+        return callback
+
+    meter.create_observable_counter(
+        "nats.client.messages",
+        callbacks=[counter(("in_msgs", {"direction": "in"}), ("out_msgs", {"direction": "out"}))],
+        unit="{message}",
+        description="Messages received and sent by the client",
+    )
+    meter.create_observable_counter(
+        "nats.client.bytes",
+        callbacks=[counter(("in_bytes", {"direction": "in"}), ("out_bytes", {"direction": "out"}))],
+        unit="By",
+        description="Payload bytes received and sent by the client",
+    )
+    meter.create_observable_counter(
+        "nats.client.reconnects",
+        callbacks=[counter(("reconnects", {}))],
+        unit="{reconnect}",
+        description="Reconnections since the client was created",
+    )
+    meter.create_observable_counter(
+        "nats.client.errors",
+        callbacks=[counter(("errors_received", {}))],
+        unit="{error}",
+        description="-ERR protocol messages received from the server",
+    )
+    meter.create_observable_gauge(
+        "nats.client.pending_bytes",
+        callbacks=[
+            lambda options: [Observation(health.pending_bytes, health.attributes) for health in list(monitors)]
+        ],
+        unit="By",
+        description="Bytes buffered for writing but not yet flushed to the server",
+    )
+    meter.create_observable_gauge(
+        "nats.client.connected",
+        callbacks=[
+            lambda options: [
+                Observation(int(health.connected), {**health.attributes, "nats.server": health.server})
+                for health in list(monitors)
+            ]
+        ],
+        description="1 while the client is connected, 0 otherwise, labelled with the current server",
+    )
+    meter.create_observable_gauge(
+        "nats.client.rtt",
+        callbacks=[
+            lambda options: [
+                Observation(health.rtt, health.attributes) for health in list(monitors) if health.rtt is not None
+            ]
+        ],
+        unit="s",
+        description="Round trip time of the last PING/PONG probe",
+    )
@@ -0,0 +1,57 @@
+import threading
+from typing import Optional
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Meter
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+
+from .config import NATSotelSettings
+
+def setup_meter(config: NATSotelSettings, instrumenting_module_name: Optional[str] = None):
+    # Define resource attributes for your service
+    resource = Resource.create(attributes={SERVICE_NAME: config.service_name})
+
+    readers = []
+
+    # OTLP Exporter
+    if config.otlp_metrics_endpoint:
+        otlp = OTLPMetricExporter(
+            endpoint=config.otlp_metrics_endpoint,
+            insecure=config.otlp_metrics_insecure,
+            headers=config.otlp_metrics_header,
+        )
+        # Observable instruments are collected once per export interval
+        readers.append(
+            PeriodicExportingMetricReader(
+                otlp,
+                export_interval_millis=config.otlp_metrics_interval * 1000,
+            )
+        )
+
+    # Create a MeterProvider
+    meter_provider = MeterProvider(resource=resource, metric_readers=readers)
+    metrics.set_meter_provider(meter_provider)
+
+    return metrics.get_meter(
+        instrumenting_module_name if instrumenting_module_name else "natsotel"
+    )
+
+
+_process_meter: Optional[Meter] = None
+_process_meter_lock = threading.Lock()
+
+
+def process_meter(config: NATSotelSettings) -> Meter:
+    """
+    The meter shared by every client in the process, set up with ``config``
+    on first use: each `setup_meter` call starts its own export thread.
+    """
+    global _process_meter
+
+    with _process_meter_lock:
+        if _process_meter is None:
+            _process_meter = setup_meter(config)
+        return _process_meter
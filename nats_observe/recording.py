@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import zlib
+import struct
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from nats.aio.msg import Msg
+
+from .utils import parse_timestamp
+
+# Segment files are a sequence of zlib compressed blocks, each prefixed by
+# (compressed length, record count). A block holds records of
+# (received unix time, subject length, data length) + subject + data.
+_BLOCK_HEADER = struct.Struct("<II")
+_RECORD_HEADER = struct.Struct("<dHI")
+# One index entry per block: (offset in segment, record count, first ts, last ts)
+_INDEX_ENTRY = struct.Struct("<QIdd")
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+class TraceRecorder:
+    """
+    Appends raw trace messages to rotating, compressed segment files.
+
+    Records are packed into an in-memory block and only compressed and written
+    once ``block_bytes`` have accumulated or ``flush_interval`` has passed, so
+    the file system sees a few large appends instead of one write per message.
+    A new segment is started once the current one exceeds ``segment_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        block_bytes: int = 256 * 1024,
+        flush_interval: float = 1.0,
+        compression_level: int = 6,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.block_bytes = block_bytes
+        self.flush_interval = flush_interval
+        self.compression_level = compression_level
+
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        self._sequence = int(os.path.basename(existing[-1])[: -len(SEGMENT_SUFFIX)]) + 1 if existing else 0
+
+        self._block = bytearray()
+        self._block_records = 0
+        self._block_first_ts = 0.0
+        self._block_last_ts = 0.0
+
+        self._segment = None
+        self._index = None
+        self._rotate()
+
+    def _rotate(self) -> None:
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+
+        base = os.path.join(self.directory, f"{self._sequence:08d}")
+        self._sequence += 1
+        self._segment = open(base + SEGMENT_SUFFIX, "ab")
+        self._index = open(base + INDEX_SUFFIX, "ab")
+
+    def append(self, subject: str, data: bytes, received: Optional[float] = None) -> None:
+        received = time.time() if received is None else received
+        encoded = subject.encode()
+
+        if not self._block_records:
+            self._block_first_ts = received
+        self._block_last_ts = received
+        self._block_records += 1
+
+        self._block += _RECORD_HEADER.pack(received, len(encoded), len(data))
+        self._block += encoded
+        self._block += data
+
+        if len(self._block) >= self.block_bytes:
+            self.flush()
+
+    async def handler(self, msg: Msg) -> None:
+        self.append(msg.subject, msg.data)
+
+    def flush(self) -> None:
+        if not self._block_records:
+            return
+
+        if self._segment is None or self._index is None or self._segment.tell() >= self.segment_bytes:
+            self._rotate()
+
+        compressed = zlib.compress(bytes(self._block), self.compression_level)
+        offset = self._segment.tell()
+
+        self._segment.write(_BLOCK_HEADER.pack(len(compressed), self._block_records) + compressed)
+        self._segment.flush()
+        self._index.write(
+            _INDEX_ENTRY.pack(offset, self._block_records, self._block_first_ts, self._block_last_ts)
+        )
+        self._index.flush()
+
+        self._block.clear()
+        self._block_records = 0
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+
+        self._segment = None
+        self._index = None
+
+
+def segment_paths(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def read_index(segment_path: str) -> List[Tuple[int, int, float, float]]:
+    index_path = segment_path[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    if not os.path.exists(index_path):
+        return []
+
+    with open(index_path, "rb") as f:
+        data = f.read()
+
+    # A torn trailing entry from a crash is ignored
+    usable = len(data) - len(data) % _INDEX_ENTRY.size
+    return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+def read_records(
+    directory: str, since: Optional[float] = None, until: Optional[float] = None
+) -> Iterator[Tuple[float, str, bytes]]:
+    """Yield ``(received, subject, data)`` from every segment in ``directory``, oldest first."""
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            for offset, _, first_ts, last_ts in read_index(path):
+                # The index lets whole blocks outside the window be skipped unread
+                if (since is not None and last_ts < since) or (until is not None and first_ts > until):
+                    continue
+
+                f.seek(offset)
+                header = f.read(_BLOCK_HEADER.size)
+                if len(header) < _BLOCK_HEADER.size:
+                    break
+
+                length, count = _BLOCK_HEADER.unpack(header)
+                block = zlib.decompress(f.read(length))
+
+                position = 0
+                for _ in range(count):
+                    received, subject_len, data_len = _RECORD_HEADER.unpack_from(block, position)
+                    position += _RECORD_HEADER.size
+                    subject = block[position : position + subject_len].decode()
+                    position += subject_len
+                    data = block[position : position + data_len]
+                    position += data_len
+
+                    if (since is not None and received < since) or (until is not None and received > until):
+                        continue
+
+                    yield received, subject, data
+
+
+async def replay(
+    directory: str,
+    cb: Callable[[Msg], Awaitable[None]],
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> int:
+    """Feed recorded messages to ``cb`` as if they had just been delivered."""
+    replayed = 0
+
+    for _, subject, data in read_records(directory, since, until):
+        await cb(Msg(_client=None, subject=subject, data=data))
+        replayed += 1
+
+    return replayed
+
+
+def analyze(
+    directory: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    percentiles: Tuple[float, ...] = (50, 90, 99, 99.9),
+) -> Dict[str, dict]:
+    """
+    Summarise a recording: throughput, message sizes and hop latency
+    percentiles, computed over NumPy arrays of the decoded trace events.
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("Analysing recordings requires numpy, `pip install nats-observe[analysis]`") from e
+
+    received: List[float] = []
+    sizes: List[int] = []
+    latencies: List[float] = []
+    ingress = egress = 0
+
+    for ts, _, data in read_records(directory, since, until):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            continue
+
+        received.append(ts)
+        sizes.append(payload.get("request", {}).get("msgsize", 0))
+
+        stamps = []
+        for event in payload.get("events", []):
+            kind = event.get("type")
+            ingress += kind == "in"
+            egress += kind == "eg"
+
+            stamp = parse_timestamp(event.get("ts"))
+            if stamp is not None:
+                stamps.append(stamp)
+
+        if stamps:
+            latencies.append((max(stamps) - min(stamps)) / 1e6)
+
+    def summary(values, unit):
+        if not len(values):
+            return {"count": 0, "unit": unit}
+
+        points = np.percentile(values, percentiles)
+        return {
+            "count": int(values.size),
+            "unit": unit,
+            "mean": float(values.mean()),
+            "max": float(values.max()),
+            **{f"p{p:g}": float(v) for p, v in zip(percentiles, points)},
+        }
+
+    received_arr = np.asarray(received, dtype=np.float64)
+    sizes_arr = np.asarray(sizes, dtype=np.int64)
+    latencies_arr = np.asarray(latencies, dtype=np.float64)
+
+    throughput = {"messages": int(received_arr.size), "ingress": ingress, "egress": egress}
+    if received_arr.size:
+        duration = float(received_arr.max() - received_arr.min())
+        per_second = np.bincount((received_arr - received_arr.min()).astype(np.int64))
+        throughput.update(
+            {
+                "duration_s": duration,
+                "mean_per_s": received_arr.size / duration if duration > 0 else float(received_arr.size),
+                "peak_per_s": int(per_second.max()),
+                "bytes": int(sizes_arr.sum()),
+            }
+        )
+
+    return {
+        "throughput": throughput,
+        "msgsize": summary(sizes_arr, "bytes"),
+        "hop_latency": summary(latencies_arr, "ms"),
+    }
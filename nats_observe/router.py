@@ -0,0 +1,135 @@
+import socket
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from nats.aio.msg import Msg
+from nats.aio.subscription import Subscription
+
+from opentelemetry.trace import Status, StatusCode
+
+from .config import PROPAGATOR
+from .utils import callback_attributes
+from .subjects import SubjectTrie, subjects_intersect
+
+if TYPE_CHECKING:
+    from .client import Client
+
+Handler = Callable[[Msg], Awaitable[None]]
+
+
+class TracedRouter:
+    """
+    Dispatches messages from a single subscription to many handlers.
+
+    The router subscribes once to ``subject``, a wildcard scoped to the
+    service such as `orders.>`, optionally in a ``queue`` group, and routes every message
+    through a subject trie to the handlers registered with :meth:`add` or
+    :meth:`route`. Context extraction, the span and the receive log happen
+    once per message; each handler invocation is recorded as a span event.
+
+        router = client.router("orders.>", queue="billing")
+
+        @router.route("orders.*.created")
+        async def on_created(msg): ...
+
+        await router.start()
+    """
+
+    def __init__(self, client: "Client", subject: str, queue: str = "", cache_size: int = 1024):
+        self.client = client
+        self.subject = subject
+        self.queue = queue
+        self.subscription: Optional[Subscription] = None
+
+        self._trie: SubjectTrie[Tuple[Handler, Dict[str, object]]] = SubjectTrie()
+        self._lookup = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, subject: str) -> Tuple[Tuple[Handler, Dict[str, object]], ...]:
+        return tuple(self._trie.match_all(subject))
+
+    def add(self, pattern: str, cb: Handler) -> None:
+        if not subjects_intersect(pattern, self.subject):
+            raise ValueError(f"`{pattern}` can never match messages from the `{self.subject}` subscription")
+
+        # Callback attributes are static, so introspect once at registration
+        self._trie.insert(pattern, (cb, callback_attributes(cb)))
+        self._lookup.cache_clear()
+
+    def route(self, pattern: str) -> Callable[[Handler], Handler]:
+        def decorator(cb: Handler) -> Handler:
+            self.add(pattern, cb)
+            return cb
+
+        return decorator
+
+    def handlers(self, subject: str) -> List[Handler]:
+        """Handlers a message on ``subject`` would be dispatched to, in order."""
+        return [cb for cb, _ in self._lookup(subject)]
+
+    async def start(self, **kwargs) -> Subscription:
+        self.subscription = await self.client.raw_subscribe(
+            self.subject, queue=self.queue, cb=self._dispatch, **kwargs
+        )
+        return self.subscription
+
+    async def stop(self) -> None:
+        if self.subscription is not None:
+            await self.subscription.unsubscribe()
+            self.subscription = None
+
+    async def _dispatch(self, msg: Msg) -> None:
+        handlers = self._lookup(msg.subject)
+        logger = logging.getLogger(self.client.config.service_name)
+
+        if not handlers:
+            logger.debug(f"No route for `{msg.subject}`")
+            return
+
+        # Extract tracing context from headers
+        ctx = PROPAGATOR.extract(msg.headers or {})
+        subject_name = self.client.subject_namer.normalize(msg.subject)
+
+        with self.client.tracer.start_as_current_span(f"nats.subscribe({subject_name})", context=ctx) as span:
+            span_attributes: Dict[str, object] = {}
+            span_attributes["host"] = socket.gethostname()
+            span_attributes.update(self.client._server_info)
+            span_attributes["nats.subject"] = msg.subject
+            span_attributes["messaging.destination.template"] = subject_name
+            span_attributes["nats.payload"] = msg.data.decode()
+            span_attributes["nats.router.handlers"] = len(handlers)
+
+            # Log the event
+            logger.info(
+                f"Received {len(msg.data)} bytes of data in `{msg.subject}`",
+                extra=span_attributes
+            )
+
+            # Set span attributes
+            span.set_attributes(span_attributes)
+
+            # Create an event for Msg received
+            span.add_event(
+                "received",
+                attributes=span_attributes
+            )
+
+            for cb, cb_attributes in handlers:
+                # A failing handler must not starve the others routed the same message
+                try:
+                    await cb(msg)
+                except Exception as e:
+                    span.record_exception(e, attributes=cb_attributes)
+                    span.set_status(Status(StatusCode.ERROR, str(e)))
+                    logger.exception(
+                        f"Handler `{cb_attributes['callback.qualname']}` failed for `{msg.subject}`",
+                        extra=span_attributes
+                    )
+                    continue
+
+                # Create an event for triggered callback
+                span.add_event(
+                    "callback",
+                    attributes=cb_attributes
+                )
+
@@ -0,0 +1,334 @@
+import time
+import random
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from opentelemetry.context import Context
+from opentelemetry.metrics import Meter, Observation
+from opentelemetry.trace import (
+    Tracer,
+    Status,
+    StatusCode,
+    SpanContext,
+    TraceFlags,
+    NonRecordingSpan,
+    get_current_span,
+    set_span_in_context,
+)
+
+from .utils import parse_timestamp
+from .subjects import SubjectNamer
+
+_ATTRIBUTE_TYPES = (str, bool, int, float)
+
+
+class BufferedTrace:
+    __slots__ = ("trace_id", "context", "first_seen", "hops")
+
+    def __init__(self, trace_id: int, context: Context, first_seen: float):
+        self.trace_id = trace_id
+        self.context = context
+        self.first_seen = first_seen
+        self.hops: List[dict] = []
+
+    @property
+    def events(self):
+        for hop in self.hops:
+            yield from hop.get("events", [])
+
+
+class TailSampler:
+    """
+    Buffers `Nats-Trace-Dest` payloads per trace ID and, ``decision_wait``
+    seconds after the first hop arrived (or earlier, when pushed out by
+    ``max_traces``), decides whether to export the trace as spans or drop it.
+
+    A trace is kept when any hop reports an error, when no hop reports an
+    egress, when the first to last event spans more than
+    ``latency_threshold_ms``, or otherwise with probability ``baseline_rate``.
+
+    Decisions are remembered for ``decision_ttl`` seconds (at most
+    ``max_traces`` of them), so hops arriving after their trace was decided
+    follow it: exported under the existing root span when kept, dropped
+    otherwise.
+    """
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        latency_threshold_ms: Optional[float] = 250.0,
+        sample_no_egress: bool = True,
+        sample_errors: bool = True,
+        baseline_rate: float = 0.01,
+        decision_wait: float = 5.0,
+        max_traces: int = 10000,
+        subject_namer: Optional[SubjectNamer] = None,
+        decision_ttl: float = 60.0,
+    ):
+        self.tracer = tracer
+        self.subject_namer = subject_namer
+        self.latency_threshold_ms = latency_threshold_ms
+        self.sample_no_egress = sample_no_egress
+        self.sample_errors = sample_errors
+        self.baseline_rate = baseline_rate
+        self.decision_wait = decision_wait
+        self.max_traces = max_traces
+        self.decision_ttl = decision_ttl
+
+        # Insertion order is arrival order, so the oldest trace is always first
+        self._traces: "OrderedDict[int, BufferedTrace]" = OrderedDict()
+        # Recent decisions in decision order: trace ID -> (decided at, root
+        # span context of a kept trace, or None when dropped)
+        self._decisions: "OrderedDict[int, Tuple[float, Optional[SpanContext]]]" = OrderedDict()
+
+        self.kept = 0
+        self.dropped = 0
+
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+    def add(self, trace_id: int, context: Context, payload: dict) -> None:
+        trace = self._traces.get(trace_id)
+
+        if trace is None:
+            if trace_id in self._decisions:
+                self._add_late(trace_id, payload)
+                return
+
+            if len(self._traces) >= self.max_traces:
+                _, oldest = self._traces.popitem(last=False)
+                self._decide(oldest)
+
+            trace = BufferedTrace(trace_id, context, time.monotonic())
+            self._traces[trace_id] = trace
+
+        trace.hops.append(payload)
+
+    def _add_late(self, trace_id: int, payload: dict) -> None:
+        _, root = self._decisions[trace_id]
+
+        # Dropped, or kept but not recorded by the tracer
+        if root is None or not root.is_valid:
+            return
+
+        # Called from the trace handler, which must not fail on export errors
+        try:
+            self._export_hops([payload], set_span_in_context(NonRecordingSpan(root)))
+        except Exception:
+            logging.getLogger("natsotel").exception(f"Tail sampler failed to export a late hop of trace {trace_id:032x}")
+
+    def _remember(self, trace_id: int, root: Optional[SpanContext]) -> None:
+        now = time.monotonic()
+        self._decisions[trace_id] = (now, root)
+        self._decisions.move_to_end(trace_id)
+
+        deadline = now - self.decision_ttl
+        while self._decisions:
+            decided_at, _ = next(iter(self._decisions.values()))
+            if decided_at > deadline and len(self._decisions) <= self.max_traces:
+                break
+            self._decisions.popitem(last=False)
+
+    def flush_expired(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        deadline = now - self.decision_wait
+        decided = 0
+
+        while self._traces:
+            trace = next(iter(self._traces.values()))
+            if trace.first_seen > deadline:
+                break
+
+            self._traces.popitem(last=False)
+            self._decide(trace)
+            decided += 1
+
+        return decided
+
+    def flush(self) -> int:
+        return self.flush_expired(float("inf"))
+
+    async def run(self, interval: Optional[float] = None):
+        interval = interval if interval else max(min(self.decision_wait / 2, 1.0), 0.05)
+
+        while True:
+            await asyncio.sleep(interval)
+
+            # Never let an unexpected failure end the loop
+            try:
+                self.flush_expired()
+            except Exception:
+                logging.getLogger("natsotel").exception("Tail sampler failed to decide expired traces")
+
+    def start(self, interval: Optional[float] = None) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(interval))
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reason(self, trace: BufferedTrace) -> Optional[str]:
+        timestamps = []
+        has_egress = False
+        has_error = False
+
+        for event in trace.events:
+            if event.get("type") == "eg":
+                has_egress = True
+            if event.get("error"):
+                has_error = True
+
+            ts = parse_timestamp(event.get("ts"))
+            if ts is not None:
+                timestamps.append(ts)
+
+        if self.sample_errors and has_error:
+            return "error"
+
+        if self.sample_no_egress and not has_egress:
+            return "no_egress"
+
+        if self.latency_threshold_ms is not None and timestamps:
+            if (max(timestamps) - min(timestamps)) / 1e6 > self.latency_threshold_ms:
+                return "latency"
+
+        if self.baseline_rate and random.random() < self.baseline_rate:
+            return "baseline"
+
+        return None
+
+    def _decide(self, trace: BufferedTrace) -> None:
+        reason = self.reason(trace)
+
+        if reason is None:
+            self.dropped += 1
+            self._remember(trace.trace_id, None)
+            return
+
+        self.kept += 1
+
+        # Also reached from the trace handler when the buffer is full, so a
+        # failing export is logged rather than raised
+        root = None
+        try:
+            root = self.export(trace, reason)
+        except Exception:
+            logging.getLogger("natsotel").exception(f"Tail sampler failed to export trace {trace.trace_id:032x}")
+
+        self._remember(trace.trace_id, root)
+
+    @staticmethod
+    def _sampled_parent(context: Context) -> Context:
+        # The SDK's parent-based sampler would drop spans under a publisher that
+        # was not head sampled, which are exactly the traces we want to keep.
+        # Re-parent onto the same trace and span IDs with the sampled flag set.
+        parent = get_current_span(context).get_span_context()
+
+        if not parent.is_valid or parent.trace_flags.sampled:
+            return context
+
+        return set_span_in_context(
+            NonRecordingSpan(
+                SpanContext(
+                    parent.trace_id,
+                    parent.span_id,
+                    is_remote=True,
+                    trace_flags=TraceFlags(TraceFlags.SAMPLED),
+                    trace_state=parent.trace_state,
+                )
+            ),
+            context,
+        )
+
+    @staticmethod
+    def _hop_bounds(hop: dict) -> Tuple[Optional[int], Optional[int]]:
+        timestamps = [ts for ts in (parse_timestamp(e.get("ts")) for e in hop.get("events", [])) if ts is not None]
+        return min(timestamps, default=None), max(timestamps, default=None)
+
+    def export(self, trace: BufferedTrace, reason: str) -> SpanContext:
+        """Export ``trace`` as a root span with a child per hop; returns the root's span context."""
+        parent_ctx = self._sampled_parent(trace.context)
+
+        bounds = [self._hop_bounds(hop) for hop in trace.hops]
+        starts = [start for start, _ in bounds if start is not None]
+        ends = [end for _, end in bounds if end is not None]
+
+        subject = next((e.get("subj") for e in trace.events if e.get("type") == "in"), None)
+        subject_name = self.subject_namer.normalize(subject) if self.subject_namer and subject else subject
+
+        root = self.tracer.start_span(
+            f"nats.message({subject_name})",
+            context=parent_ctx,
+            start_time=min(starts, default=None),
+            attributes={
+                "nats.subject": subject or "",
+                "nats.hops": len(trace.hops),
+                "sampling.reason": reason,
+            },
+        )
+
+        if reason == "error":
+            root.set_status(Status(StatusCode.ERROR))
+
+        self._export_hops(trace.hops, set_span_in_context(root, parent_ctx))
+        root.end(end_time=max(ends, default=None))
+
+        logging.getLogger("natsotel").debug(
+            f"Tail sampler kept trace {trace.trace_id:032x} ({reason})",
+            extra={"trace_id": f"{trace.trace_id:032x}", "sampling.reason": reason},
+        )
+
+        return root.get_span_context()
+
+    def _export_hops(self, hops: Iterable[dict], root_ctx: Context) -> None:
+        for hop in hops:
+            start, end = self._hop_bounds(hop)
+            server = hop.get("server", {})
+            span = self.tracer.start_span(
+                f"nats.hop({server.get('name', 'unknown')})",
+                context=root_ctx,
+                start_time=start,
+                attributes={
+                    f"nats.server.{k}": v for k, v in server.items() if isinstance(v, _ATTRIBUTE_TYPES)
+                },
+            )
+
+            for event in hop.get("events", []):
+                span.add_event(
+                    f"event.{event.get('type', 'unknown')}",
+                    attributes={
+                        f"event.{k}": v for k, v in event.items() if isinstance(v, _ATTRIBUTE_TYPES)
+                    },
+                    timestamp=parse_timestamp(event.get("ts")),
+                )
+                if event.get("error"):
+                    span.set_status(Status(StatusCode.ERROR, str(event["error"])))
+
+            span.end(end_time=end)
+
+    def register_metrics(self, meter: Meter) -> None:
+        """Export buffer occupancy and decisions on ``meter``."""
+        meter.create_observable_gauge(
+            "nats.tail_sampler.buffered",
+            callbacks=[lambda options: [Observation(len(self._traces))]],
+            unit="{trace}",
+            description="Traces waiting for a tail sampling decision",
+        )
+        meter.create_observable_counter(
+            "nats.tail_sampler.decisions",
+            callbacks=[
+                lambda options: [
+                    Observation(self.kept, {"decision": "kept"}),
+                    Observation(self.dropped, {"decision": "dropped"}),
+                ]
+            ],
+            unit="{trace}",
+            description="Tail sampling decisions taken",
+        )
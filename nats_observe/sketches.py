@@ -0,0 +1,259 @@
+import time
+import threading
+from array import array
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from opentelemetry.metrics import Meter, Observation
+
+# Large Mersenne prime used for the pairwise-independent row hashes
+_PRIME = (1 << 61) - 1
+
+# `kind` of a message trace ingress event received from a client connection,
+# as opposed to a route, gateway or leaf node connection
+CLIENT_KIND = 0
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-K counter (Metwally et al.).
+
+    Keeps at most ``capacity`` monitored keys. When a new key arrives and the
+    table is full, the key with the smallest count is replaced and its count
+    is inherited as the new key's over-estimation ``error``.
+    """
+
+    def __init__(self, capacity: int = 32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        counts = self._counts
+
+        if key in counts:
+            counts[key] += count
+            return
+
+        if len(counts) < self.capacity:
+            counts[key] = count
+            self._errors[key] = 0
+            return
+
+        # Evict the current minimum, the newcomer inherits its count as error
+        victim = min(counts, key=counts.__getitem__)
+        floor = counts.pop(victim)
+        del self._errors[victim]
+
+        counts[key] = floor + count
+        self._errors[key] = floor
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, int, int]]:
+        """Return ``(key, count, error)`` tuples, highest count first."""
+        ranked = sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)
+        if n is not None:
+            ranked = ranked[:n]
+        return [(key, count, self._errors[key]) for key, count in ranked]
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._errors.clear()
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch with ``depth`` rows of ``width`` 64-bit counters.
+
+    Estimates never under-count; with probability ``1 - e^-depth`` the
+    over-count is at most ``e / width`` of the total inserted weight.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, seed: int = 0x5EED):
+        if width <= 0 or depth <= 0:
+            raise ValueError("width and depth must be positive")
+
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+        # Derive (a, b) coefficients per row deterministically from the seed
+        state = seed
+        self._coefficients: List[Tuple[int, int]] = []
+        for _ in range(depth):
+            state = (state * 6364136223846793005 + 1442695040888963407) & 0xFFFFFFFFFFFFFFFF
+            a = (state >> 3) % (_PRIME - 1) + 1
+            state = (state * 6364136223846793005 + 1442695040888963407) & 0xFFFFFFFFFFFFFFFF
+            b = (state >> 3) % _PRIME
+            self._coefficients.append((a, b))
+
+    def _indexes(self, key: Hashable):
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        width = self.width
+        for a, b in self._coefficients:
+            yield ((a * h + b) % _PRIME) % width
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        self.total += count
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += count
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def clear(self) -> None:
+        self.total = 0
+        for row in self._rows:
+            row[:] = array("Q", bytes(8 * self.width))
+
+
+class HeavyHitters:
+    """
+    Fixed-memory view of which subjects, publishers and accounts drive traffic.
+
+    Top-K tables are cumulative since start-up. Per-subject rates are estimated
+    from a Count-Min sketch over a tumbling ``window`` (seconds); the last full
+    window is used once one is available, otherwise the current partial one.
+    """
+
+    def __init__(self, top_k: int = 32, width: int = 2048, depth: int = 4, window: float = 60.0):
+        self.window = window
+
+        self.subjects = SpaceSaving(top_k)
+        self.publishers = SpaceSaving(top_k)
+        self.accounts = SpaceSaving(top_k)
+
+        self._current = CountMinSketch(width, depth)
+        self._previous = CountMinSketch(width, depth)
+        self._has_previous = False
+        self._window_start = time.monotonic()
+
+        # Snapshots may be taken from the metric reader's export thread
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float) -> None:
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return
+
+        self._previous, self._current = self._current, self._previous
+        self._current.clear()
+        # An idle gap longer than two windows leaves nothing in the last window
+        if elapsed >= 2 * self.window:
+            self._previous.clear()
+        self._has_previous = True
+        self._window_start = now
+
+    def observe(self, subject: str, publisher: Optional[str] = None, account: Optional[str] = None) -> None:
+        with self._lock:
+            self._rotate(time.monotonic())
+
+            self.subjects.add(subject)
+            self._current.add(subject)
+            if publisher:
+                self.publishers.add(publisher)
+            if account:
+                self.accounts.add(account)
+
+    def observe_trace(self, payload: dict) -> None:
+        """
+        Count the client ingress events of a decoded `Nats-Trace-Dest` payload.
+
+        Every server a message crosses reports its own payload, with an
+        ingress event from the route, gateway or leaf node it came over; only
+        the hop where a client published counts, so a message is counted once.
+        """
+        server_name = payload.get("server", {}).get("name", "")
+
+        for event in payload.get("events", []):
+            if event.get("type") != "in" or event.get("kind") != CLIENT_KIND or not event.get("subj"):
+                continue
+
+            # Connection ids are only unique within a server
+            publisher = event.get("name") or (f"{server_name}:cid:{event['cid']}" if "cid" in event else None)
+            self.observe(event["subj"], publisher, event.get("acc"))
+
+    def rate(self, subject: str) -> float:
+        """Estimated messages per second for ``subject``."""
+        with self._lock:
+            now = time.monotonic()
+            self._rotate(now)
+
+            if self._has_previous:
+                return self._previous.estimate(subject) / self.window
+
+            elapsed = max(now - self._window_start, 1.0)
+            return self._current.estimate(subject) / elapsed
+
+    def snapshot(self, n: Optional[int] = None) -> dict:
+        with self._lock:
+            subjects = self.subjects.top(n)
+            publishers = self.publishers.top(n)
+            accounts = self.accounts.top(n)
+
+        return {
+            "subjects": [
+                {"key": key, "count": count, "error": error, "rate": self.rate(key)}
+                for key, count, error in subjects
+            ],
+            "publishers": [
+                {"key": key, "count": count, "error": error} for key, count, error in publishers
+            ],
+            "accounts": [
+                {"key": key, "count": count, "error": error} for key, count, error in accounts
+            ],
+        }
+
+    def register_metrics(self, meter: Meter) -> None:
+        """
+        Export the top-K tables as observable gauges on ``meter``.
+
+        Series are keyed by ``rank`` (0 is the hottest) rather than by the key
+        itself: the SDK keeps every attribute set it has seen, so keying by
+        subject would grow with subject cardinality. Use `python -m
+        nats_observe top` to see which key currently holds a rank.
+        """
+
+        def observe(table: SpaceSaving):
+            def callback(options):
+                with self._lock:
+                    ranked = table.top()
+                return [Observation(count, {"rank": rank}) for rank, (_, count, _) in enumerate(ranked)]
+
+            return callback
+
+        meter.create_observable_gauge(
+            "nats.hot.subject.messages",
+            callbacks=[observe(self.subjects)],
+            unit="{message}",
+            description="Messages seen per top-K subject rank (space-saving estimate)",
+        )
+        meter.create_observable_gauge(
+            "nats.hot.publisher.messages",
+            callbacks=[observe(self.publishers)],
+            unit="{message}",
+            description="Messages seen per top-K publisher rank (space-saving estimate)",
+        )
+        meter.create_observable_gauge(
+            "nats.hot.account.messages",
+            callbacks=[observe(self.accounts)],
+            unit="{message}",
+            description="Messages seen per top-K account rank (space-saving estimate)",
+        )
+
+        def rates(options):
+            with self._lock:
+                ranked = self.subjects.top()
+            return [Observation(self.rate(key), {"rank": rank}) for rank, (key, _, _) in enumerate(ranked)]
+
+        meter.create_observable_gauge(
+            "nats.hot.subject.rate",
+            callbacks=[rates],
+            unit="{message}/s",
+            description="Estimated message rate per top-K subject rank (count-min)",
+        )
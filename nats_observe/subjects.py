@@ -0,0 +1,167 @@
+import re
+from functools import lru_cache
+from typing import Any, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Tokens that look like identifiers rather than names: integers, UUIDs,
+# long hex keys and long separator-free alphanumeric keys (ULIDs, nuids, ...).
+_ID_TOKEN = re.compile(
+    r"""^(?:
+        \d+
+      | [0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}
+      | (?=[^.]*\d)[0-9a-fA-F]{12,}
+    )$""",
+    re.VERBOSE,
+)
+_KEY_TOKEN = re.compile(r"^[A-Za-z0-9]{20,}$")
+
+
+def _is_id(token: str) -> bool:
+    if _ID_TOKEN.match(token):
+        return True
+
+    # Random keys are digit-heavy; names with a version or number in them
+    # (`orderCreatedEventV2`) are mostly letters
+    return bool(_KEY_TOKEN.match(token)) and sum(c.isdigit() for c in token) * 10 >= len(token)
+
+
+def subjects_intersect(a: str, b: str) -> bool:
+    """Whether some concrete subject matches both patterns ``a`` and ``b``."""
+    a_tokens, b_tokens = a.split("."), b.split(".")
+
+    for i in range(max(len(a_tokens), len(b_tokens))):
+        a_token = a_tokens[i] if i < len(a_tokens) else None
+        b_token = b_tokens[i] if i < len(b_tokens) else None
+
+        # `>` needs at least one token, which the other side must provide
+        if a_token == ">":
+            return b_token is not None
+        if b_token == ">":
+            return a_token is not None
+
+        if a_token is None or b_token is None:
+            return False
+        if a_token != b_token and a_token != "*" and b_token != "*":
+            return False
+
+    return True
+
+
+class _Node:
+    __slots__ = ("children", "star", "tail", "values")
+
+    def __init__(self):
+        self.children: dict = {}
+        self.star: Optional["_Node"] = None
+        self.tail: List[Any] = []
+        self.values: List[Any] = []
+
+
+class SubjectTrie(Generic[T]):
+    """
+    Token trie over NATS subject patterns supporting `*` (exactly one token)
+    and `>` (one or more trailing tokens).
+
+    Matching walks one trie level per subject token, so the cost depends on the
+    number of tokens, not on the number of registered patterns.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, pattern: str, value: T) -> None:
+        node = self._root
+        tokens = pattern.split(".")
+
+        for i, token in enumerate(tokens):
+            if token == ">":
+                if i != len(tokens) - 1:
+                    raise ValueError(f"`>` must be the last token of `{pattern}`")
+                node.tail.append(value)
+                return
+
+            if token == "*":
+                if node.star is None:
+                    node.star = _Node()
+                node = node.star
+            else:
+                child = node.children.get(token)
+                if child is None:
+                    child = node.children[token] = _Node()
+                node = child
+
+        node.values.append(value)
+
+    def match(self, subject: str) -> Optional[T]:
+        """Return the value of the most specific matching pattern (literal before `*` before `>`)."""
+        return self._match_first(self._root, subject.split("."), 0)
+
+    def _match_first(self, node: _Node, tokens: List[str], i: int) -> Optional[T]:
+        if i == len(tokens):
+            return node.values[0] if node.values else None
+
+        child = node.children.get(tokens[i])
+        if child is not None:
+            found = self._match_first(child, tokens, i + 1)
+            if found is not None:
+                return found
+
+        if node.star is not None:
+            found = self._match_first(node.star, tokens, i + 1)
+            if found is not None:
+                return found
+
+        return node.tail[0] if node.tail else None
+
+    def match_all(self, subject: str) -> List[T]:
+        """Return the values of every matching pattern, most specific first."""
+        found: List[T] = []
+        self._match_all(self._root, subject.split("."), 0, found)
+        return found
+
+    def _match_all(self, node: _Node, tokens: List[str], i: int, found: List[T]) -> None:
+        if i == len(tokens):
+            found.extend(node.values)
+            return
+
+        child = node.children.get(tokens[i])
+        if child is not None:
+            self._match_all(child, tokens, i + 1, found)
+
+        if node.star is not None:
+            self._match_all(node.star, tokens, i + 1, found)
+
+        found.extend(node.tail)
+
+
+class SubjectNamer:
+    """
+    Maps concrete subjects to low-cardinality names for spans.
+
+    A subject matching one of ``templates`` is named after the template,
+    e.g. `orders.12345.created` -> `orders.*.created`. Otherwise, with
+    ``detect_ids``, tokens that look like identifiers are replaced with `*`.
+    Results are memoised in an LRU cache of ``cache_size`` subjects.
+    """
+
+    def __init__(self, templates: Iterable[str] = (), detect_ids: bool = True, cache_size: int = 1024):
+        self.detect_ids = detect_ids
+
+        self._trie: SubjectTrie[str] = SubjectTrie()
+        for template in templates:
+            self._trie.insert(template, template)
+
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, subject: str) -> str:
+        template = self._trie.match(subject)
+        if template is not None:
+            return template
+
+        if self.detect_ids:
+            tokens = subject.split(".")
+            if any(_is_id(token) for token in tokens):
+                return ".".join("*" if _is_id(token) else token for token in tokens)
+
+        return subject
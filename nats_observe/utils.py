@@ -1,4 +1,6 @@
-from typing import List
+import re
+import calendar
+from typing import Callable, Dict, List
 from nats.aio.msg import Msg
 
 from opentelemetry.trace.span import SpanContext
@@ -18,4 +20,38 @@ def get_trace_spancontext(msg: Msg) -> List[SpanContext] | None:
         return None
 
     span_context_list = [v.get_span_context() for v in ctx.values()]
-    return span_context_list
\ No newline at end of file
+    return span_context_list
+
+def callback_attributes(cb: Callable) -> Dict[str, object]:
+    # Span event attributes describing a user callback, shared by every
+    # traced subscription path so they stay the same everywhere
+    return {
+        "callback.module": cb.__module__,
+        "callback.repr": str(cb.__repr__()),
+        "callback.name": cb.__code__.co_name,
+        "callback.names": list(cb.__code__.co_names),
+        "callback.qualname": cb.__code__.co_qualname,
+        "callback.filename": cb.__code__.co_filename,
+    }
+
+_RFC3339 = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)[Tt ](\d\d):(\d\d):(\d\d)(?:\.(\d+))?(?:([Zz])|([+-])(\d\d):(\d\d))?$"
+)
+
+def parse_timestamp(value: str) -> int | None:
+    # Nats.io trace events carry RFC3339 timestamps with nanosecond precision,
+    # which `datetime.fromisoformat` can't represent, so parse them by hand.
+    match = _RFC3339.match(value or "")
+
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second, fraction, _, sign, off_h, off_m = match.groups()
+    seconds = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second)))
+
+    if sign:
+        offset = int(off_h) * 3600 + int(off_m) * 60
+        seconds -= offset if sign == "+" else -offset
+
+    nanos = int((fraction or "0")[:9].ljust(9, "0"))
+    return seconds * 1_000_000_000 + nanos
@@ -0,0 +1,28 @@
+import pytest
+
+from nats_observe.bench import LatencyHistogram
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram(precision_bits=8)
+    for value in range(1, 100_001):
+        histogram.record(value * 1000)
+
+    assert histogram.count == 100_000
+    assert histogram.min == 1000 and histogram.max == 100_000_000
+    for p in (50, 90, 99, 99.9):
+        expected = p / 100 * 100_000_000
+        assert histogram.percentile(p) == pytest.approx(expected, rel=1 / 128)
+
+
+def test_histogram_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for value in range(100):
+        a.record(value)
+        b.record(value + 100)
+
+    a.merge(b)
+    assert a.count == 200
+    assert a.percentile(50) == 99
+    assert a.max == 199
+    assert a.mean == pytest.approx(99.5)
@@ -0,0 +1,105 @@
+import queue
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace import get_current_span
+
+from nats_observe.bridge import ThreadSafePublisher
+
+
+class FakeClient:
+    def __init__(self):
+        self.config = SimpleNamespace(service_name="test")
+        self.published = []
+
+    async def publish(self, subject, data, headers=None, context=None):
+        self.published.append((subject, get_current_span(context).get_span_context().span_id))
+
+
+def test_publishes_from_threads_keep_caller_context():
+    tracer = TracerProvider().get_tracer("test")
+    client = FakeClient()
+    span_ids = {}
+
+    def worker(i, publisher):
+        with tracer.start_as_current_span(f"worker.{i}") as span:
+            span_ids[f"jobs.{i}"] = span.get_span_context().span_id
+            for _ in range(100):
+                publisher.publish(f"jobs.{i}", b"x")
+
+    async def main():
+        publisher = ThreadSafePublisher(client, capacity=32, batch_size=8).start()
+        threads = [threading.Thread(target=worker, args=(i, publisher)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        await asyncio.gather(*(asyncio.to_thread(thread.join) for thread in threads))
+        await publisher.close()
+
+    asyncio.run(main())
+
+    assert len(client.published) == 400
+    assert all(span_id == span_ids[subject] for subject, span_id in client.published)
+
+
+def test_full_buffer_raises_without_blocking():
+    async def main():
+        publisher = ThreadSafePublisher(FakeClient(), capacity=2).start()
+        publisher.publish("a", b"")
+        publisher.publish("a", b"")
+        with pytest.raises(queue.Full):
+            publisher.publish("a", b"", block=False)
+        await publisher.close()
+
+    asyncio.run(main())
+
+
+def test_full_buffer_on_loop_thread_raises_instead_of_blocking():
+    async def main():
+        publisher = ThreadSafePublisher(FakeClient(), capacity=1).start()
+        publisher.publish("a", b"")
+        with pytest.raises(queue.Full):
+            publisher.publish("a", b"", timeout=5)
+        await publisher.close()
+
+    asyncio.run(main())
+
+
+def test_close_fails_blocked_producers_and_publishes_buffered():
+    client = FakeClient()
+    errors = []
+
+    def producer(publisher):
+        try:
+            publisher.publish("b", b"")
+        except RuntimeError as e:
+            errors.append(e)
+
+    async def main():
+        gate = asyncio.Event()
+        publish = client.publish
+
+        async def gated_publish(*args, **kwargs):
+            await gate.wait()
+            await publish(*args, **kwargs)
+
+        client.publish = gated_publish
+
+        publisher = ThreadSafePublisher(client, capacity=1).start()
+        publisher.publish("a", b"")
+        threads = [threading.Thread(target=producer, args=(publisher,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+
+        closing = asyncio.create_task(publisher.close())
+        await asyncio.sleep(0.05)
+        gate.set()
+        await closing
+        await asyncio.wait_for(asyncio.gather(*(asyncio.to_thread(thread.join) for thread in threads)), timeout=5)
+
+    asyncio.run(main())
+
+    assert [subject for subject, _ in client.published] == ["a"]
+    assert len(errors) == 3
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from nats_observe.health import ConnectionHealth
+
+
+class FakeClient(SimpleNamespace):
+    async def rtt(self, timeout):
+        return 0.004
+
+
+def test_samples_are_exported_as_metrics():
+    client = FakeClient(
+        stats={"in_msgs": 5, "out_msgs": 7, "in_bytes": 50, "out_bytes": 70, "reconnects": 1, "errors_received": 0},
+        is_connected=True,
+        is_closed=False,
+        pending_data_size=128,
+        connected_url=urlparse("nats://127.0.0.1:4222"),
+    )
+    reader = InMemoryMetricReader()
+    health = ConnectionHealth(client)
+    health.register_metrics(MeterProvider(metric_readers=[reader]).get_meter("test"))
+
+    health.sample()
+    asyncio.run(health.probe_rtt())
+
+    metrics = {
+        metric.name: {
+            tuple(sorted(point.attributes.items())): point.value for point in metric.data.data_points
+        }
+        for metric in reader.get_metrics_data().resource_metrics[0].scope_metrics[0].metrics
+    }
+    client_id = ("nats.client.id", health.client_id)
+    server = ("nats.server", "127.0.0.1:4222")
+
+    assert metrics["nats.client.messages"][(("direction", "out"), client_id)] == 7
+    assert metrics["nats.client.reconnects"][(client_id,)] == 1
+    assert metrics["nats.client.pending_bytes"][(client_id,)] == 128
+    assert metrics["nats.client.connected"][(client_id, server)] == 1
+    assert metrics["nats.client.rtt"][(client_id,)] == 0.004
+
+
+def test_counters_do_not_restart_on_reconnect():
+    client = FakeClient(
+        stats={"in_msgs": 5, "out_msgs": 7, "in_bytes": 50, "out_bytes": 70, "reconnects": 0, "errors_received": 0},
+        is_connected=True,
+        is_closed=False,
+        pending_data_size=0,
+        connected_url=urlparse("nats://127.0.0.1:4222"),
+    )
+    reader = InMemoryMetricReader()
+    health = ConnectionHealth(client)
+    health.register_metrics(MeterProvider(metric_readers=[reader]).get_meter("test"))
+
+    health.sample()
+    reader.get_metrics_data()
+
+    client.connected_url = urlparse("nats://127.0.0.1:4223")
+    client.stats = {**client.stats, "reconnects": 1, "out_msgs": 9}
+    health.sample()
+
+    metrics = {
+        metric.name: metric.data.data_points
+        for metric in reader.get_metrics_data().resource_metrics[0].scope_metrics[0].metrics
+    }
+    out = [point.value for point in metrics["nats.client.messages"] if point.attributes["direction"] == "out"]
+    assert out == [9]
+    assert [dict(point.attributes) for point in metrics["nats.client.connected"]] == [
+        {"nats.client.id": health.client_id, "nats.server": "127.0.0.1:4223"}
+    ]
+
+
+def test_clients_sharing_a_meter_are_all_exported():
+    clients = [
+        FakeClient(
+            stats={"out_msgs": n},
+            is_connected=True,
+            is_closed=False,
+            pending_data_size=n,
+            connected_url=urlparse("nats://127.0.0.1:4222"),
+        )
+        for n in (3, 4)
+    ]
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("test")
+    monitors = [ConnectionHealth(client) for client in clients]
+    for health in monitors:
+        health.register_metrics(meter)
+        health.sample()
+
+    def exported():
+        metrics = {
+            metric.name: metric.data.data_points
+            for metric in reader.get_metrics_data().resource_metrics[0].scope_metrics[0].metrics
+        }
+        return {
+            point.attributes["nats.client.id"]: point.value
+            for point in metrics["nats.client.pending_bytes"]
+        }
+
+    assert exported() == {monitors[0].client_id: 3, monitors[1].client_id: 4}
+
+    monitors[0].stop()
+    assert exported() == {monitors[1].client_id: 4}
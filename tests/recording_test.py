@@ -0,0 +1,63 @@
+import json
+import asyncio
+
+import pytest
+
+from nats_observe.recording import TraceRecorder, analyze, read_records, replay, segment_paths
+
+
+def trace_payload(i):
+    return json.dumps(
+        {
+            "request": {"msgsize": 100 + i},
+            "events": [
+                {"type": "in", "ts": f"2024-01-01T00:00:00.{i:03d}000000Z", "subj": "orders.created"},
+                {"type": "eg", "ts": f"2024-01-01T00:00:00.{i + 5:03d}000000Z", "sub": "orders.created"},
+            ],
+        }
+    ).encode()
+
+
+def test_records_round_trip_across_segments(tmp_path):
+    recorder = TraceRecorder(str(tmp_path), segment_bytes=256, block_bytes=512)
+    for i in range(100):
+        recorder.append("trace.logs", trace_payload(i), received=1000.0 + i)
+    recorder.close()
+
+    assert len(segment_paths(str(tmp_path))) > 1
+
+    records = list(read_records(str(tmp_path)))
+    assert [r[0] for r in records] == [1000.0 + i for i in range(100)]
+    assert records[7][1] == "trace.logs"
+    assert records[7][2] == trace_payload(7)
+
+    window = list(read_records(str(tmp_path), since=1010.0, until=1019.0))
+    assert len(window) == 10
+
+
+async def collect(directory):
+    seen = []
+
+    async def cb(msg):
+        seen.append(msg.subject)
+
+    count = await replay(directory, cb)
+    return count, seen
+
+
+def test_replay_and_analyze(tmp_path):
+    pytest.importorskip("numpy")
+
+    recorder = TraceRecorder(str(tmp_path))
+    for i in range(20):
+        recorder.append("trace.logs", trace_payload(i), received=1000.0 + i / 10)
+    recorder.close()
+
+    count, seen = asyncio.run(collect(str(tmp_path)))
+    assert count == 20 and set(seen) == {"trace.logs"}
+
+    report = analyze(str(tmp_path))
+    assert report["throughput"]["messages"] == 20
+    assert report["throughput"]["ingress"] == 20
+    assert report["hop_latency"]["p50"] == pytest.approx(5.0)
+    assert report["msgsize"]["max"] == 119
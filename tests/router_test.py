@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from nats.aio.msg import Msg
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from nats_observe.router import TracedRouter
+from nats_observe.subjects import SubjectNamer
+
+
+def make_router():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    client = SimpleNamespace(
+        config=SimpleNamespace(service_name="test"),
+        tracer=provider.get_tracer("test"),
+        subject_namer=SubjectNamer(),
+        _server_info={},
+    )
+    return TracedRouter(client, "orders.>"), exporter
+
+
+def test_dispatches_to_every_matching_handler_in_one_span():
+    router, exporter = make_router()
+    calls = []
+
+    @router.route("orders.*.created")
+    async def on_created(msg):
+        calls.append("created")
+
+    @router.route("orders.>")
+    async def on_any(msg):
+        calls.append("any")
+
+    @router.route("orders.eu.deleted")
+    async def on_deleted(msg):
+        calls.append("deleted")
+
+    assert router.handlers("orders.eu.created") == [on_created, on_any]
+
+    asyncio.run(router._dispatch(Msg(_client=None, subject="orders.42.created", data=b"{}")))
+
+    assert calls == ["created", "any"]
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == ["nats.subscribe(orders.*.created)"]
+    assert [event.name for event in spans[0].events] == ["received", "callback", "callback"]
+
+
+def test_failing_handler_does_not_stop_dispatch():
+    router, exporter = make_router()
+    calls = []
+
+    @router.route("orders.>")
+    async def broken(msg):
+        raise RuntimeError("boom")
+
+    @router.route("orders.*")
+    async def healthy(msg):
+        calls.append(msg.subject)
+
+    asyncio.run(router._dispatch(Msg(_client=None, subject="orders.1", data=b"")))
+
+    assert calls == ["orders.1"]
+    assert not exporter.get_finished_spans()[0].status.is_ok
+
+
+def test_rejects_patterns_outside_the_subscription():
+    router, _ = make_router()
+
+    async def handler(msg):
+        pass
+
+    for pattern in ("orders.*", "*.eu.created", ">", "orders.>"):
+        router.add(pattern, handler)
+
+    for pattern in ("invoices.>", "orders", "*"):
+        with pytest.raises(ValueError):
+            router.add(pattern, handler)
@@ -0,0 +1,140 @@
+import asyncio
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from nats_observe.config import PROPAGATOR
+from nats_observe.sampling import TailSampler
+
+
+def make_sampler(**kwargs):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return TailSampler(provider.get_tracer("test"), baseline_rate=0.0, **kwargs), exporter
+
+
+def hop(ingress_ts, egress_ts=None, error=None):
+    events = [{"type": "in", "ts": ingress_ts, "subj": "orders.created", "acc": "$G"}]
+    if egress_ts:
+        events.append({"type": "eg", "ts": egress_ts, "sub": "orders.created"})
+    if error:
+        events[0]["error"] = error
+    return {"server": {"name": "n1"}, "events": events}
+
+
+def test_fast_delivered_trace_is_dropped():
+    sampler, exporter = make_sampler()
+
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00.000000000Z", "2024-01-01T00:00:00.001000000Z"))
+    assert sampler.flush() == 1
+
+    assert sampler.dropped == 1
+    assert exporter.get_finished_spans() == ()
+
+
+def test_slow_undelivered_and_failed_traces_are_kept():
+    sampler, exporter = make_sampler(latency_threshold_ms=100)
+
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00Z", "2024-01-01T00:00:00.500Z"))
+    sampler.add(2, Context(), hop("2024-01-01T00:00:00Z"))
+    sampler.add(3, Context(), hop("2024-01-01T00:00:00Z", "2024-01-01T00:00:00Z", error="no permission"))
+    sampler.flush()
+
+    assert sampler.kept == 3
+    reasons = {
+        span.attributes["sampling.reason"]
+        for span in exporter.get_finished_spans()
+        if span.name.startswith("nats.message")
+    }
+    assert reasons == {"latency", "no_egress", "error"}
+
+
+def test_buffer_is_bounded():
+    sampler, _ = make_sampler(max_traces=2)
+
+    for trace_id in range(5):
+        sampler.add(trace_id, Context(), hop("2024-01-01T00:00:00Z", "2024-01-01T00:00:00Z"))
+
+    assert len(sampler) == 2
+    assert sampler.dropped == 3
+
+
+def test_unsampled_publisher_trace_is_still_exported():
+    sampler, exporter = make_sampler()
+    trace_id = 0x4BF92F3577B34DA6A3CE929D0E0E4736
+    ctx = PROPAGATOR.extract({"traceparent": f"00-{trace_id:032x}-00f067aa0ba902b7-00"})
+
+    sampler.add(trace_id, ctx, hop("2024-01-01T00:00:00Z"))
+    sampler.flush()
+
+    assert sampler.kept == 1
+    spans = exporter.get_finished_spans()
+    assert len(spans) == 2
+    root = next(span for span in spans if span.name.startswith("nats.message"))
+    assert root.context.trace_id == trace_id
+    assert root.parent.span_id == 0x00F067AA0BA902B7
+
+
+def test_background_loop_survives_export_failures():
+    sampler, _ = make_sampler(decision_wait=0.0)
+
+    def export(trace, reason):
+        raise RuntimeError("backend down")
+
+    sampler.export = export
+
+    async def main():
+        sampler.start(interval=0.01)
+        sampler.add(1, Context(), hop("2024-01-01T00:00:00Z"))
+        await asyncio.sleep(0.05)
+        sampler.add(2, Context(), hop("2024-01-01T00:00:00Z"))
+        await asyncio.sleep(0.05)
+        running = not sampler._task.done()
+        sampler.stop()
+        return running
+
+    assert asyncio.run(main())
+    assert len(sampler) == 0
+
+
+def test_late_hops_follow_the_recorded_decision():
+    sampler, exporter = make_sampler()
+
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00Z"))
+    sampler.add(2, Context(), hop("2024-01-01T00:00:00Z", "2024-01-01T00:00:00Z"))
+    sampler.flush()
+
+    # Second hops of both traces: the undelivered one is kept, so its late
+    # hop joins the existing root; the delivered one was dropped
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00.001Z", "2024-01-01T00:00:00.002Z"))
+    sampler.add(2, Context(), hop("2024-01-01T00:00:00.001Z"))
+    sampler.flush()
+
+    assert (sampler.kept, sampler.dropped) == (1, 1)
+    assert len(sampler) == 0
+
+    spans = exporter.get_finished_spans()
+    roots = [span for span in spans if span.name.startswith("nats.message")]
+    hops = [span for span in spans if span.name.startswith("nats.hop")]
+    assert len(roots) == 1
+    assert len(hops) == 2
+    assert all(span.parent.span_id == roots[0].context.span_id for span in hops)
+
+
+def test_evicted_trace_export_failure_does_not_reach_the_handler():
+    sampler, _ = make_sampler(max_traces=1)
+
+    def export(trace, reason):
+        raise RuntimeError("backend down")
+
+    sampler.export = export
+
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00Z"))
+    sampler.add(2, Context(), hop("2024-01-01T00:00:00Z"))
+    sampler.add(1, Context(), hop("2024-01-01T00:00:00Z"))
+
+    assert sampler.kept == 1
+    assert len(sampler) == 1
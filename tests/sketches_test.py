@@ -0,0 +1,101 @@
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from nats_observe.sketches import CountMinSketch, HeavyHitters, SpaceSaving
+
+
+def test_space_saving_keeps_heavy_hitters():
+    table = SpaceSaving(capacity=4)
+
+    for i in range(1000):
+        table.add("hot")
+        table.add(f"cold.{i}")
+
+    assert len(table) == 4
+    key, count, error = table.top(1)[0]
+    assert key == "hot"
+    assert count - error <= 1000 <= count
+
+
+def test_count_min_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+
+    for i in range(500):
+        sketch.add(f"subject.{i % 50}")
+
+    assert sketch.total == 500
+    for i in range(50):
+        assert sketch.estimate(f"subject.{i}") >= 10
+
+
+def test_heavy_hitters_observe_trace():
+    heavy_hitters = HeavyHitters(top_k=8, width=128, depth=2)
+    payload = {
+        "events": [
+            {"type": "in", "kind": 0, "subj": "orders.created", "cid": 7, "name": "svc-a", "acc": "$G"},
+            {"type": "eg", "sub": "orders.created", "cid": 9, "acc": "$G"},
+        ]
+    }
+
+    for _ in range(3):
+        heavy_hitters.observe_trace(payload)
+
+    snapshot = heavy_hitters.snapshot()
+    assert snapshot["subjects"][0]["key"] == "orders.created"
+    assert snapshot["subjects"][0]["count"] == 3
+    assert snapshot["subjects"][0]["rate"] > 0
+    assert snapshot["publishers"][0]["key"] == "svc-a"
+    assert snapshot["accounts"][0]["key"] == "$G"
+
+
+def test_heavy_hitters_count_multi_hop_message_once():
+    heavy_hitters = HeavyHitters(top_k=8, width=128, depth=2)
+    hops = [
+        {
+            "server": {"name": "s1"},
+            "events": [
+                {"type": "in", "kind": 0, "subj": "orders.created", "cid": 7, "acc": "$G"},
+                {"type": "eg", "kind": 1, "sub": "orders.created", "cid": 3, "name": "s2"},
+            ],
+        },
+        {
+            "server": {"name": "s2"},
+            "events": [
+                {"type": "in", "kind": 1, "subj": "orders.created", "cid": 4, "name": "s1", "acc": "$G"},
+                {"type": "eg", "kind": 0, "sub": "orders.created", "cid": 9, "acc": "$G"},
+            ],
+        },
+    ]
+
+    for hop in hops:
+        heavy_hitters.observe_trace(hop)
+
+    snapshot = heavy_hitters.snapshot()
+    assert [(row["key"], row["count"]) for row in snapshot["subjects"]] == [("orders.created", 1)]
+    assert [(row["key"], row["count"]) for row in snapshot["accounts"]] == [("$G", 1)]
+    assert [row["key"] for row in snapshot["publishers"]] == ["s1:cid:7"]
+
+
+def retained_series(provider, reader):
+    # The SDK never prunes attribute sets, so count what it holds on to
+    storage = provider._measurement_consumer._reader_storages[reader]
+    return {
+        instrument.name: sum(len(match._attributes_aggregation) for match in matches)
+        for instrument, matches in storage._instrument_view_instrument_matches.items()
+    }
+
+
+def test_exported_series_stay_bounded():
+    reader = InMemoryMetricReader()
+    provider = MeterProvider(metric_readers=[reader])
+    heavy_hitters = HeavyHitters(top_k=4, width=128, depth=2)
+    heavy_hitters.register_metrics(provider.get_meter("test"))
+
+    # Every round a new subject becomes the hottest one
+    for i in range(200):
+        for _ in range(i + 1):
+            heavy_hitters.observe(f"subject.{i}", f"publisher.{i}", f"account.{i}")
+        reader.get_metrics_data()
+
+    series = retained_series(provider, reader)
+    assert series and all(count <= 4 for count in series.values())
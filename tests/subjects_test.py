@@ -0,0 +1,45 @@
+from nats_observe.subjects import SubjectNamer, SubjectTrie, subjects_intersect
+
+
+def test_trie_prefers_most_specific_pattern():
+    trie = SubjectTrie()
+    trie.insert("orders.>", "tail")
+    trie.insert("orders.*.created", "star")
+    trie.insert("orders.eu.created", "literal")
+
+    assert trie.match("orders.eu.created") == "literal"
+    assert trie.match("orders.us.created") == "star"
+    assert trie.match("orders.us.deleted") == "tail"
+    assert trie.match("orders") is None
+    assert trie.match("invoices.1") is None
+
+
+def test_namer_uses_templates_then_id_detection():
+    namer = SubjectNamer(["orders.*.created"])
+
+    assert namer.normalize("orders.12345.created") == "orders.*.created"
+    assert namer.normalize("users.42.profile") == "users.*.profile"
+    assert namer.normalize("jobs.0b7c6f3e-2f59-4d5e-9c1a-8b3f1e2d4c5a.done") == "jobs.*.done"
+    assert namer.normalize("devices.01HZX3K8V6Q2M9T4R7N5B1C0DE.status") == "devices.*.status"
+    assert namer.normalize("dummy.foo") == "dummy.foo"
+    assert namer.normalize("dummy.deadbeefcafe") == "dummy.deadbeefcafe"
+    assert namer.normalize("events.order_created_event_v2") == "events.order_created_event_v2"
+    assert namer.normalize("svc.user-profile-settings-v2") == "svc.user-profile-settings-v2"
+    assert namer.normalize("metrics.cpu_usage_percent_p99") == "metrics.cpu_usage_percent_p99"
+    assert namer.normalize("events.orderCreatedNotificationV2") == "events.orderCreatedNotificationV2"
+    assert namer.normalize("inbox.Qx7rT2bL9mKp4VwZ8nYc3d") == "inbox.*"
+
+
+def test_namer_without_id_detection_keeps_unmatched_subjects():
+    namer = SubjectNamer(detect_ids=False)
+
+    assert namer.normalize("users.42.profile") == "users.42.profile"
+
+
+def test_subjects_intersect():
+    assert subjects_intersect("orders.*.created", "orders.>")
+    assert subjects_intersect("*.eu.*", "orders.>")
+    assert subjects_intersect(">", "orders.eu")
+    assert not subjects_intersect("orders", "orders.>")
+    assert not subjects_intersect("orders.eu", "orders.us")
+    assert not subjects_intersect("orders.*", "orders.*.created")